@@ -10,10 +10,13 @@ import shutil
 import zipfile
 import json
 
+import numpy as np
+import orjson
 from fastapi import FastAPI, HTTPException, UploadFile, File, Depends, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, SerializationInfo, field_serializer, field_validator
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from sqlmodel import Session, select
@@ -87,27 +90,45 @@ class ParsedParams(BaseModel):
     pulseWidth: Optional[float] = None
     tokens: List[str] = []
 
+def _float_array(v) -> np.ndarray:
+    # orjson only writes native-endian, C-contiguous arrays; parser channels may be big-endian views
+    return np.ascontiguousarray(v, dtype=np.float64)
+
+def _array_out(v: np.ndarray, info: SerializationInfo):
+    # Python mode keeps the ndarray for orjson; JSON mode (jsonable_encoder) still needs lists
+    return v.tolist() if info.mode_is_json() else v
+
 class Spectrum1D(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     id: str
     filename: str
     type: SpectrumType
     parsedParams: Optional[ParsedParams] = None
     xLabel: str
     yLabel: str
-    xData: List[float]
-    realData: List[float]
-    imagData: List[float]
+    xData: np.ndarray
+    realData: np.ndarray
+    imagData: np.ndarray
+
+    _arrays_in = field_validator('xData', 'realData', 'imagData', mode='before')(_float_array)
+    _arrays_out = field_serializer('xData', 'realData', 'imagData')(_array_out)
 
 class Spectrum2D(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     id: str
     filename: str
     type: SpectrumType
     parsedParams: Optional[ParsedParams] = None
     xLabel: str
     yLabel: str
-    xData: List[float]
-    yData: List[float]
-    zData: List[List[float]]
+    xData: np.ndarray
+    yData: np.ndarray
+    zData: np.ndarray
+
+    _arrays_in = field_validator('xData', 'yData', 'zData', mode='before')(_float_array)
+    _arrays_out = field_serializer('xData', 'yData', 'zData')(_array_out)
 
 Spectrum = Union[Spectrum1D, Spectrum2D]
 
@@ -160,7 +181,15 @@ def get_guest_store(token: str = "guest-token"):
 
 # --- App ---
 
-app = FastAPI(title="Spectra Explorer Backend")
+class AppJSONResponse(ORJSONResponse):
+    # ndarrays are serialized by orjson directly, no per-float Python conversion
+    def render(self, content) -> bytes:
+        return orjson.dumps(
+            content,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS,
+        )
+
+app = FastAPI(title="Spectra Explorer Backend", default_response_class=AppJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -216,10 +245,14 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), session: Session = D
 
 # --- Core Logic Functions ---
 
-def parse_and_process(content: bytes, sample_id: str, save_to_disk: bool = False) -> tuple[str, Dict[str, Spectrum], List[SpectrumFileModel], Dict[str, int]]:
+def parse_and_process(content: Union[bytes, str], sample_id: str, save_to_disk: bool = False) -> tuple[str, Dict[str, Spectrum], List[SpectrumFileModel], Dict[str, int]]:
     # ... Same parsing logic as before ...
+    # content is the uploaded archive bytes, or the path of an archive already on disk
     try:
-        sample_name, raw_spectra, count = parsers.parse_zip_archive(content)
+        if isinstance(content, str):
+            sample_name, raw_spectra, count = parsers.parse_zip_archive_path(content)
+        else:
+            sample_name, raw_spectra, count = parsers.parse_zip_archive(content)
         
         spectra: Dict[str, Spectrum] = {}
         files: List[SpectrumFileModel] = []
@@ -240,6 +273,7 @@ def parse_and_process(content: bytes, sample_id: str, save_to_disk: bool = False
             if raw.parsed_params:
                 pp = ParsedParams(**raw.parsed_params)
             
+            # Parser ndarrays are kept as-is (made native/contiguous by the models) for orjson
             if isinstance(raw, parsers.Spectrum1D):
                 spec = Spectrum1D(
                     id=spec_id, filename=raw.filename, type=raw.type, parsedParams=pp,
@@ -435,18 +469,18 @@ def list_spectra(
         if not os.path.exists(zip_path):
              raise HTTPException(404, "Data file missing")
              
-        with open(zip_path, "rb") as f:
-            content = f.read()
-            _, spectra, _, _ = parse_and_process(content, sample_id)
-            # Filter by selected filenames
-            filtered = [s for s in spectra.values() if s.filename in selected_filenames]
-            for s in filtered:
-                print(f"Server returning: {s.filename} (Type: {s.type})")
-                print(f"  Keys: {s.dict().keys()}")
-                if hasattr(s, 'zData'):
-                     print(f"  Has zData: {len(s.zData) if s.zData else 'None/Empty'}")
-            
-            return {"spectra": filtered}
+        # Parse straight from disk instead of reading the whole archive into memory
+        _, spectra, _, _ = parse_and_process(zip_path, sample_id)
+        # Filter by selected filenames
+        filtered = [s for s in spectra.values() if s.filename in selected_filenames]
+        for s in filtered:
+            print(f"Server returning: {s.filename} (Type: {s.type})")
+            print(f"  Keys: {s.dict().keys()}")
+            if hasattr(s, 'zData'):
+                 print(f"  Has zData: {len(s.zData) if s.zData.size else 'None/Empty'}")
+        
+        # Returned as a response directly: a plain dict would go through jsonable_encoder (lists)
+        return AppJSONResponse({"spectra": [s.model_dump() for s in filtered]})
             
     else:
         store = get_guest_store()
@@ -454,7 +488,7 @@ def list_spectra(
         files = store['files'].get(sample_id, [])
         selected_filenames = {f.filename for f in files if f.selected}
         
-        return {"spectra": [s for s in spectra_map.values() if s.filename in selected_filenames]}
+        return AppJSONResponse({"spectra": [s.model_dump() for s in spectra_map.values() if s.filename in selected_filenames]})
 
 @app.delete("/samples/{sample_id}", status_code=204)
 def delete_sample(
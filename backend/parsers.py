@@ -1,12 +1,23 @@
 
 import zipfile
 import re
+import functools
 import io
+import mmap
+import os
 import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
-from typing import Dict, List, Optional, Tuple, Union
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple, Union
 import logging
 
+try:
+    from numba import njit
+except ImportError:  # pure NumPy fallback below
+    njit = None
+
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -14,9 +25,51 @@ logger = logging.getLogger(__name__)
 
 SpectrumType = str  # 'CW', 'T1', etc.
 
+# One Quad-Interleaved BES3T record: [R1, I1, R2, I2] as Big Endian Double
+QUAD_DTYPE = np.dtype([('r1', '>f8'), ('i1', '>f8'), ('r2', '>f8'), ('i2', '>f8')])
+
+# Precompiled patterns (DSC parsing and filename parameter tokens)
+# One DSC line: "KEY<whitespace>value" or "KEY = value". Blank lines and
+# '*' comment lines never match.
+_DSC_LINE_RE = re.compile(
+    r'^[^\S\n]*([^\s=*][^\s=]*)'
+    r'(?:[^\S\n]*=[^\S\n]*((?:.*\S)?)|[^\S\n]+(\S(?:.*\S)?))',
+    re.MULTILINE,
+)
+_EXT_RE = re.compile(r'\.[^.]+$')
+_PAT_K = re.compile(r'(\d+(?:[p\.]\d+)?)k')
+_PAT_G = re.compile(r'(\d+(?:[p\.]\d+)?)g')
+_PAT_DB = re.compile(r'(?:hpa)?(\d+(?:[p\.]\d+)?)db')
+_PAT_HPA = re.compile(r'hpa(\d+(?:[p\.]\d+)?)')
+_PAT_P = re.compile(r'p(\d+(?:[p\.]\d+)?)')
+_PAT_SW = re.compile(r'sw(\d+(?:[p\.]\d+)?)')
+
+# Filename markers for the spectrum type, in priority order (first hit wins, not leftmost)
+_TYPE_MARKERS = (
+    ('edfs', 'EDFS'),
+    ('rabi', 'Rabi'),
+    ('t1', 'T1'),
+    ('t2', 'T2'),
+    ('hyscore', 'HYSCORE'),
+    ('2d', '2D'),
+    ('cw', 'CW'),
+)
+
+# Per-thread ZipFile handle used by the parse pool
+_WORKER_ZIP = threading.local()
+# Per-thread read buffer for compressed DTA members, reused from pair to pair
+_BUFPOOL = threading.local()
+
+# ZIP local file header: fixed part before the name/extra fields
+_LOCAL_HEADER_SIZE = 30
+_READ_CHUNK = 1 << 20
+
+# Values checked at each end of a channel for the wrong-endian magnitude heuristic
+_ENDIAN_PROBE = 64
+
 class Spectrum1D:
     def __init__(self, filename: str, type: SpectrumType, x_label: str, y_label: str, 
-                 x_data: List[float], real_data: List[float], imag_data: List[float], parsed_params: dict = None):
+                 x_data: np.ndarray, real_data: np.ndarray, imag_data: np.ndarray, parsed_params: Mapping[str, object] = None):
         self.filename = filename
         self.type = type
         self.x_label = x_label
@@ -28,7 +81,7 @@ class Spectrum1D:
 
 class Spectrum2D:
     def __init__(self, filename: str, type: SpectrumType, x_label: str, y_label: str,
-                 x_data: List[float], y_data: List[float], z_data: List[List[float]], parsed_params: dict = None):
+                 x_data: np.ndarray, y_data: np.ndarray, z_data: np.ndarray, parsed_params: Mapping[str, object] = None):
         self.filename = filename
         self.type = type
         self.x_label = x_label
@@ -40,25 +93,11 @@ class Spectrum2D:
 
 
 def parse_dsc_text(text: str) -> Dict[str, str]:
-    meta = {}
-    for line in text.splitlines():
-        trimmed = line.strip()
-        if not trimmed or trimmed.startswith('*'):
-            continue
-        
-        # "=" separated
-        if '=' in trimmed:
-            key, val = trimmed.split('=', 1)
-            meta[key.strip().upper()] = val.strip()
-            continue
-            
-        # Whitespace separated (tab or spaces)
-        parts = re.split(r'\s+', trimmed, maxsplit=1)
-        if len(parts) == 2:
-            key, val = parts
-            meta[key.strip().upper()] = val.strip()
-            
-    return meta
+    # Single sweep over the whole text; group 2 is the "=" value, group 3 the whitespace one
+    return {
+        m.group(1).upper(): m.group(2) if m.group(2) is not None else m.group(3)
+        for m in _DSC_LINE_RE.finditer(text)
+    }
 
 def get_int(meta: Dict[str, str], key: str, fallback=0) -> int:
     try:
@@ -75,9 +114,11 @@ def get_float(meta: Dict[str, str], key: str, fallback=0.0) -> float:
 def get_str(meta: Dict[str, str], key: str, fallback="") -> str:
     return meta.get(key.upper(), fallback)
 
-def parse_params_from_name(raw_name: str) -> dict:
-    base = re.sub(r'\.[^.]+$', '', raw_name)
-    tokens = [t for t in base.split('_') if t]
+@functools.lru_cache(maxsize=4096)
+def parse_params_from_name(raw_name: str) -> Mapping[str, object]:
+    # Cached and shared between calls, so the result is read-only (copy with dict() to mutate)
+    base = _EXT_RE.sub('', raw_name)
+    tokens = tuple(t for t in base.split('_') if t)
     sample_name = tokens[0] if tokens else base
     
     params = {
@@ -91,34 +132,35 @@ def parse_params_from_name(raw_name: str) -> dict:
     
     for tok in tokens:
         lower = tok.lower()
-        if m := re.match(r'(\d+(?:[p\.]\d+)?)k', lower):
+        if m := _PAT_K.match(lower):
             params['temperatureK'] = float(m.group(1).replace('p', '.'))
-        if m := re.match(r'(\d+(?:[p\.]\d+)?)g', lower):
+        if m := _PAT_G.match(lower):
             params['fieldG'] = float(m.group(1).replace('p', '.'))
-        if m := re.match(r'(?:hpa)?(\d+(?:[p\.]\d+)?)db', lower):
+        if m := _PAT_DB.match(lower):
             params['amplifierDb'] = float(m.group(1).replace('p', '.'))
-        elif m := re.match(r'hpa(\d+(?:[p\.]\d+)?)', lower):
+        elif m := _PAT_HPA.match(lower):
             params['amplifierDb'] = float(m.group(1).replace('p', '.'))
-        if m := re.match(r'p(\d+(?:[p\.]\d+)?)', lower):
+        if m := _PAT_P.match(lower):
             params['pulseWidth'] = float(m.group(1).replace('p', '.'))
-        if m := re.match(r'sw(\d+(?:[p\.]\d+)?)', lower):
+        if m := _PAT_SW.match(lower):
             params['spectralWidth'] = float(m.group(1).replace('p', '.'))
             
-    return params
+    return MappingProxyType(params)
 
 def infer_spectrum_type(name: str, meta: Dict[str, str], is_2d: bool) -> str:
+    # EXPT is the only descriptor consulted, so it alone goes into the cache key
+    return _infer_spectrum_type(name, get_str(meta, 'EXPT', ''), is_2d)
+
+@functools.lru_cache(maxsize=4096)
+def _infer_spectrum_type(name: str, family: str, is_2d: bool) -> str:
     lower_name = name.lower()
     
     base_type = 'Unknown'
-    if 'edfs' in lower_name: base_type = 'EDFS'
-    elif 'rabi' in lower_name: base_type = 'Rabi'
-    elif 't1' in lower_name: base_type = 'T1'
-    elif 't2' in lower_name: base_type = 'T2'
-    elif 'hyscore' in lower_name: base_type = 'HYSCORE'
-    elif '2d' in lower_name: base_type = '2D'
-    elif 'cw' in lower_name: base_type = 'CW'
+    for marker, label in _TYPE_MARKERS:
+        if marker in lower_name:
+            base_type = label
+            break
     else:
-        family = get_str(meta, 'EXPT', '')
         if 'CW' in family: base_type = 'CW'
         elif 'PULSED' in family: base_type = 'T1' # Default pulsed is T1-ish
     
@@ -146,363 +188,526 @@ def infer_spectrum_type(name: str, meta: Dict[str, str], is_2d: bool) -> str:
 
     return base_type
 
-def axis_vector(meta: Dict[str, str], axis: str, points: int) -> List[float]:
+def axis_vector(meta: Dict[str, str], axis: str, points: int) -> np.ndarray:
     min_val = get_float(meta, f'{axis}MIN', None)
     width = get_float(meta, f'{axis}WID', None)
     
     if min_val is not None and width is not None:
-        if points <= 1: return [min_val]
-        step = width / (points - 1)
-        return [min_val + i * step for i in range(points)]
+        if points <= 1: return np.array([min_val], dtype=np.float64)
+        return np.linspace(min_val, min_val + width, points)
         
     start = get_float(meta, f'{axis}STRT', None)
     stop = get_float(meta, f'{axis}STOP', None)
     
     if start is not None and stop is not None:
-        if points <= 1: return [start]
-        step = (stop - start) / (points - 1)
-        return [start + i * step for i in range(points)]
+        if points <= 1: return np.array([start], dtype=np.float64)
+        return np.linspace(start, stop, points)
         
-    return list(range(points))
+    return np.arange(points, dtype=np.float64)
 
-def normalize_x_for_time_type(x: List[float], type: str, label: str) -> List[float]:
-    # Logic to zero-correct time axes if needed
-    time_types = ['T1', 'T2', 'Rabi']
-    is_time = any(u in label.lower() for u in ['time', 'tau', ' s', 'ms', 'us', 'ns'])
-    
+def _is_time_axis(type: str, label: str) -> bool:
     # EDFS is Field Sweep, never normalize even if label says 'us' (common Bruker metadata issue)
     if type == 'EDFS':
-        return x
+        return False
+    time_types = ['T1', 'T2', 'Rabi']
+    is_time = any(u in label.lower() for u in ['time', 'tau', ' s', 'ms', 'us', 'ns'])
+    return type in time_types or is_time
 
-    if type in time_types or is_time:
-        if not x: return x
-        min_val = min(x)
+def normalize_x_for_time_type(x: np.ndarray, type: str, label: str) -> np.ndarray:
+    # Logic to zero-correct time axes if needed
+    if _is_time_axis(type, label):
+        if len(x) == 0: return x
+        min_val = x.min()
         if min_val != 0:
-            return [v - min_val for v in x]
+            return x - min_val
     return x
 
-def parse_zip_archive(content: bytes) -> Tuple[str, List[Union[Spectrum1D, Spectrum2D]], int]:
-    zf = zipfile.ZipFile(io.BytesIO(content))
-    spectra = []
-    sample_name = "Uploaded Sample"
+def build_x_axis(meta: Dict[str, str], xpts: int, spectrum_type: str, label: str,
+                 name: str = '') -> Tuple[np.ndarray, str]:
+    # X axis with time zeroing and field unit correction applied in place on one allocation.
+    # Returns the axis and its (possibly rewritten) label.
+    x = axis_vector(meta, 'X', xpts)
+    if len(x) == 0:
+        return x, label
     
-    # 1. Look for metadata.json files (Simulated/Processed export format)
-    # For now, sticking to BES3T logic as that's the core request, 
-    # but the frontend also handled metadata.json. Let's prioritize .DSC for now
-    # as the user requested "move all processing to backend" implying the raw data parsing.
+    # 1. Zero-correct time axes
+    offset = x.min() if _is_time_axis(spectrum_type, label) else 0.0
     
-    dsc_files = [f for f in zf.namelist() if f.lower().endswith('.dsc')]
+    # 2. EDFS Correction Logic: field axes are reported in Gauss
+    scale = 1.0
+    new_label = label
+    x_lower = label.lower()
+    is_mag_field = 'gauss' in x_lower or 'field' in x_lower or 'G' in label or spectrum_type == 'EDFS'
+    if is_mag_field:
+        max_val = x.max() - offset
+        if '(T)' in label or '(Tesla)' in label:
+            scale = 10000.0
+        elif '(mT)' in label:
+            scale = 10.0
+        elif '(kG)' in label or '(kg)' in x_lower:
+            scale = 1000.0
+        elif spectrum_type == 'EDFS' and max_val <= 20:
+            scale = 1000.0
+            logger.info(f"Applied EDFS Correction for {name}")
+        if scale != 1.0:
+            new_label = "Magnetic Field (G)"
     
-    for dsc_path in dsc_files:
-        try:
-            # Read DSC
-            dsc_content = zf.read(dsc_path).decode('utf-8', errors='ignore')
-            meta = parse_dsc_text(dsc_content)
-            
-            # Find matching DTA
-            base_name = dsc_path[:-4] # strip .dsc
-            dta_path = None
+    if offset != 0:
+        x -= offset
+    if scale != 1.0:
+        x *= scale
+    return x, new_label
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _smooth_nb(a):
+        # Fused loop: sum |x[i+1]-x[i]|, min and max in a single pass
+        s = 0.0
+        mn = a[0]
+        mx = a[0]
+        for i in range(1, a.shape[0]):
+            d = a[i] - a[i - 1]
+            s += d if d >= 0 else -d
+            if a[i] < mn: mn = a[i]
+            if a[i] > mx: mx = a[i]
+        r = mx - mn
+        return 0.0 if r == 0 else s / (a.shape[0] - 1) / r
+
+    # Warm-compile at import so the first upload doesn't pay for it
+    _smooth_nb(np.zeros(2))
+else:
+    _smooth_nb = None
+
+def _smooth(arr: np.ndarray) -> float:
+    # Simple smoothness check: mean step relative to the signal range (lower is smoother)
+    if len(arr) < 2: return 0
+    # Native float64: numba needs native byte order, and int32 channels would overflow in diff/ptp.
+    # Heads are short so the copy is cheap.
+    arr = np.ascontiguousarray(arr, dtype=np.float64)
+    if _smooth_nb is not None:
+        return _smooth_nb(arr)
+    return np.mean(np.abs(np.diff(arr))) / (np.ptp(arr) or 1.0)
+
+def _smooth_scores(*arrs: np.ndarray) -> List[float]:
+    # _smooth for several equal-length heads at once (one diff/ptp pass over the stack)
+    # Empty heads score 1 (treated as noisy)
+    n = len(arrs[0])
+    if _smooth_nb is not None or n < 2 or any(len(a) != n for a in arrs):
+        return [_smooth(a) if len(a) > 0 else 1 for a in arrs]
+    stack = np.stack(arrs).astype(np.float64, copy=False)
+    ptp = np.ptp(stack, axis=1)
+    ptp[ptp == 0] = 1.0
+    return (np.mean(np.abs(np.diff(stack, axis=1)), axis=1) / ptp).tolist()
+
+def _open_zip(source: Union[bytes, str]) -> zipfile.ZipFile:
+    return zipfile.ZipFile(io.BytesIO(source) if isinstance(source, bytes) else source)
+
+def _open_worker_zip(source: Union[bytes, str], content):
+    # ZipFile handles share one file position, so each pool thread reads through its own
+    _WORKER_ZIP.zf = _open_zip(source)
+    _WORKER_ZIP.content = content
+
+def _read_member(zf: zipfile.ZipFile, name: str, content) -> Tuple[memoryview, bool]:
+    # Member bytes without the extra full-size copy zf.read() makes.
+    # The flag is True when the view is over this thread's pooled buffer, which the next
+    # call overwrites: anything kept from it must be copied out first (see _detach_spectra)
+    info = zf.getinfo(name)
+    if info.compress_type == zipfile.ZIP_STORED and not info.flag_bits & 0x1:
+        # Stored (and unencrypted): the data sits verbatim after the local header, view it in place
+        header = content[info.header_offset : info.header_offset + _LOCAL_HEADER_SIZE]
+        if len(header) == _LOCAL_HEADER_SIZE and header[:4] == zipfile.stringFileHeader:
+            fname_len, extra_len = struct.unpack('<HH', header[26:30])
+            start = info.header_offset + _LOCAL_HEADER_SIZE + fname_len + extra_len
+            return memoryview(content)[start : start + info.file_size], False
+    
+    # Compressed: stream into the pooled buffer, growing it only when this member is larger
+    buf = getattr(_BUFPOOL, 'b', None)
+    if buf is None or len(buf) < info.file_size:
+        buf = bytearray(info.file_size)
+        _BUFPOOL.b = buf
+    view = memoryview(buf)[:info.file_size]
+    pos = 0
+    with zf.open(info) as f:
+        while pos < len(view):
+            n = f.readinto(view[pos : pos + _READ_CHUNK])
+            if not n:
+                break
+            pos += n
+    return view[:pos], True
+
+def _detach_spectra(spectra: List[Union[Spectrum1D, Spectrum2D]], buf: memoryview):
+    # Copy out the channel arrays that still view the pooled buffer (kept spectra only)
+    for spec in spectra:
+        for attr in ('real_data', 'imag_data', 'z_data'):
+            arr = getattr(spec, attr, None)
+            if arr is not None and np.may_share_memory(arr, buf):
+                setattr(spec, attr, arr.copy())
+
+def _dataset_configs(meta: Dict[str, str], points_per_input: int, n_bytes: int,
+                     dsc_path: str) -> Optional[List[dict]]:
+    # Per-dataset (channel) layout declared by the DSC, or None if the DTA size disagrees.
+    # Metadata descriptors can be comma-separated lists for multiple datasets (channels)
+    ikkf_list = get_str(meta, 'IKKF', 'CPLX').split(',')
+    irfmt_list = get_str(meta, 'IRFMT', 'F').split(',')
+    
+    # Normalize list lengths
+    num_datasets = max(len(ikkf_list), len(irfmt_list))
+    if len(ikkf_list) < num_datasets: ikkf_list += [ikkf_list[-1]] * (num_datasets - len(ikkf_list))
+    if len(irfmt_list) < num_datasets: irfmt_list += [irfmt_list[-1]] * (num_datasets - len(irfmt_list))
+    
+    # Structure and Total Expected Size
+    dataset_configs = []
+    total_bytes_expected = 0
+    
+    bseq = get_str(meta, 'BSEQ', 'BIG')
+    endian = '>' if 'BIG' in bseq else '<'
+    
+    for i in range(num_datasets):
+        is_cplx = 'CPLX' in ikkf_list[i] or 'IIFMT' in meta
+        fmt_char = irfmt_list[i]
+        
+        if 'D' in fmt_char:
+            dtype = np.float64
+            item_size = 8
+        elif 'I' in fmt_char:
+            dtype = np.int32
+            item_size = 4
+        else:
+            dtype = np.float32 # 'F'
+            item_size = 4
             
-            # Try exact replacement
-            candidates = [f'{base_name}.DTA', f'{base_name}.dta']
-            for c in candidates:
-                if c in zf.namelist():
-                    dta_path = c
+        points = points_per_input
+        components = 2 if is_cplx else 1
+        size_bytes = points * components * item_size
+        
+        dataset_configs.append({
+            'is_complex': is_cplx,
+            'dtype': dtype,
+            'endian': endian,
+            'size_bytes': size_bytes,
+            'shape': points * components
+        })
+        total_bytes_expected += size_bytes
+
+    if n_bytes != total_bytes_expected:
+        # Fallback: sometimes XPTS/YPTS are wrong, or extra padding?
+        # But strict check prevents garbage.
+        # Special check: if only 1 dataset expected but size is double, assume implicit 2nd channel?
+        # (User Case handled by proper IKKF parsing hopefully)
+        logger.warning(f"Size mismatch {dsc_path}: got {n_bytes}, expected {total_bytes_expected}")
+        return None
+    return dataset_configs
+
+def _parse_dsc_pair(dsc_path: str, names: List[str], names_set: set,
+                    names_lower_map: Dict[str, str]) -> List[Union[Spectrum1D, Spectrum2D]]:
+    zf = _WORKER_ZIP.zf
+    spectra = []
+
+    try:
+        # Read DSC
+        dsc_content = zf.read(dsc_path).decode('utf-8', errors='ignore')
+        meta = parse_dsc_text(dsc_content)
+        
+        # Find matching DTA
+        base_name = dsc_path[:-4] # strip .dsc
+        dta_path = None
+        
+        # Try exact replacement
+        candidates = [f'{base_name}.DTA', f'{base_name}.dta']
+        for c in candidates:
+            if c in names_set:
+                dta_path = c
+                break
+        
+        if not dta_path:
+            # Case-insensitive sibling (e.g. .Dta)
+            dta_path = names_lower_map.get(f'{base_name}.dta'.lower())
+        
+        if not dta_path:
+            # Fallback: search in same folder
+            folder = '/'.join(dsc_path.split('/')[:-1])
+            filename = dsc_path.split('/')[-1][:-4]
+            for f in names:
+                if f.lower().endswith('.dta') and filename.lower() in f.lower():
+                    # Simple check, might be too loose
+                    dta_path = f
                     break
+        
+        if not dta_path:
+            logger.warning(f"No DTA found for {dsc_path}")
+            return []
             
-            if not dta_path:
-                # Fallback: search in same folder
-                folder = '/'.join(dsc_path.split('/')[:-1])
-                filename = dsc_path.split('/')[-1][:-4]
-                for f in zf.namelist():
-                    if f.lower().endswith('.dta') and filename.lower() in f.lower():
-                        # Simple check, might be too loose
-                        dta_path = f
-                        break
+        # Parse Binary Data
+        dta_bytes, pooled = _read_member(zf, dta_path, _WORKER_ZIP.content)
+        
+        xpts = get_int(meta, 'XPTS')
+        ypts = get_int(meta, 'YPTS', 1)
+        total_points_per_input = xpts * ypts
+        
+        # Helper to check complexity roughly (though we should check IKKF per dataset)
+        # Typically for CW like this, IKKF is CPLX,CPLX
+        is_complex_global = 'CPLX' in get_str(meta, 'IKKF', 'REAL')
+        
+        # Match CSV layout: [R1, I1, R2, I2] (Stride 4)
+        # R1 (Index 0) = Real Signal (Matches CSV Col 2)
+        # R2 (Index 2) = Imag Signal (Matches CSV Col 4)
+        # Decided up front from the DTA size alone, so quad files skip the per-dataset layout check
+        is_quad_interleaved = is_complex_global and len(dta_bytes) == total_points_per_input * QUAD_DTYPE.itemsize
+        
+        # 1. Determine Structure and Total Expected Size (standard layout only)
+        dataset_configs = None
+        if not is_quad_interleaved:
+            dataset_configs = _dataset_configs(meta, total_points_per_input, len(dta_bytes), dsc_path)
+            if dataset_configs is None:
+                return []
             
-            if not dta_path:
-                logger.warning(f"No DTA found for {dsc_path}")
-                continue
+        # 2. Extract Data
+        current_offset = 0
+        x_axis_label_base = f"{get_str(meta, 'XNAM')} ({get_str(meta, 'XUNI')})"
+        
+        # Common axes
+        # Note: We need infer_spectrum_type first.
+        spectrum_type = infer_spectrum_type(base_name, meta, ypts > 1)
+        parsed_params = parse_params_from_name(base_name.split('/')[-1])
+        # Time zeroing and field unit corrections are applied once, inside build_x_axis
+        x_vector, x_axis_label_base = build_x_axis(meta, xpts, spectrum_type, x_axis_label_base, base_name)
+        
+        parsed_quad = False
+        
+        if is_quad_interleaved:
+            logger.info(f"Detected Quad-Interleaved Data (4 vals/point). Parsing as single merged spectrum.")
+            try:
+                # We assume Big Endian Double as verified by CSV match
+                # Parse ALL records in one shot (zero-copy view over the DTA bytes)
+                recs = np.frombuffer(dta_bytes, dtype=QUAD_DTYPE)
                 
-            # Parse Binary Data
-            dta_bytes = zf.read(dta_path)
-            
-            xpts = get_int(meta, 'XPTS')
-            ypts = get_int(meta, 'YPTS', 1)
-            total_points_per_input = xpts * ypts
-            
-            # Metadata descriptors can be comma-separated lists for multiple datasets (channels)
-            ikkf_list = get_str(meta, 'IKKF', 'CPLX').split(',')
-            irfmt_list = get_str(meta, 'IRFMT', 'F').split(',')
-            
-            # Normalize list lengths
-            num_datasets = max(len(ikkf_list), len(irfmt_list))
-            if len(ikkf_list) < num_datasets: ikkf_list += [ikkf_list[-1]] * (num_datasets - len(ikkf_list))
-            if len(irfmt_list) < num_datasets: irfmt_list += [irfmt_list[-1]] * (num_datasets - len(irfmt_list))
-            
-            # 1. Determine Structure and Total Expected Size
-            dataset_configs = []
-            total_bytes_expected = 0
-            
-            bseq = get_str(meta, 'BSEQ', 'BIG')
-            endian = '>' if 'BIG' in bseq else '<'
-            
-            for i in range(num_datasets):
-                is_cplx = 'CPLX' in ikkf_list[i] or 'IIFMT' in meta
-                fmt_char = irfmt_list[i]
+                real_data = recs['r1'] # Index 0
+                imag_data = recs['r2'] # Index 2
                 
-                if 'D' in fmt_char:
-                    dtype = np.float64
-                    item_size = 8
-                elif 'I' in fmt_char:
-                    dtype = np.int32
-                    item_size = 4
-                else:
-                    dtype = np.float32 # 'F'
-                    item_size = 4
-                    
-                points = total_points_per_input
-                components = 2 if is_cplx else 1
-                size_bytes = points * components * item_size
+                filename_only = base_name.split('/')[-1]
+                y_axis_label = f"{get_str(meta, 'YNAM')} ({get_str(meta, 'YUNI')})"
                 
-                dataset_configs.append({
-                    'is_complex': is_cplx,
-                    'dtype': dtype,
-                    'endian': endian,
-                    'size_bytes': size_bytes,
-                    'shape': points * components
-                })
-                total_bytes_expected += size_bytes
-
-            if len(dta_bytes) != total_bytes_expected:
-                # Fallback: sometimes XPTS/YPTS are wrong, or extra padding?
-                # But strict check prevents garbage.
-                # Special check: if only 1 dataset expected but size is double, assume implicit 2nd channel?
-                # (User Case handled by proper IKKF parsing hopefully)
-                logger.warning(f"Size mismatch {dsc_path}: got {len(dta_bytes)}, expected {total_bytes_expected}")
-                continue
+                if ypts > 1:
+                    # 2D Spectrum
+                    y_vector = axis_vector(meta, 'Y', ypts)
+                    # Reshape flat real_data into rows (Standard raster order)
+                    z_data = np.ascontiguousarray(real_data).reshape(ypts, xpts)
+                    
+                    spec = Spectrum2D(
+                        filename=filename_only,
+                        type=spectrum_type,
+                        x_label=x_axis_label_base,
+                        y_label=y_axis_label,
+                        x_data=x_vector,
+                        y_data=y_vector,
+                        z_data=z_data,
+                        parsed_params=parsed_params
+                    )
+                else:
+                    spec = Spectrum1D(
+                        filename=filename_only,
+                        type=spectrum_type,
+                        x_label=x_axis_label_base,
+                        y_label=y_axis_label,
+                        x_data=x_vector,
+                        real_data=real_data,
+                        imag_data=imag_data,
+                        parsed_params=parsed_params
+                    )
+                spectra.append(spec)
+                parsed_quad = True
                 
-            # 2. Extract Data
-            current_offset = 0
-            x_axis_label_base = f"{get_str(meta, 'XNAM')} ({get_str(meta, 'XUNI')})"
-            
-            # Common axes
-            x_vector = axis_vector(meta, 'X', xpts)
-            # Apply corrections once
-            # Note: We need infer_spectrum_type first.
-            spectrum_type = infer_spectrum_type(base_name, meta, ypts > 1)
-            parsed_params = parse_params_from_name(base_name.split('/')[-1])
-            x_vector = normalize_x_for_time_type(x_vector, spectrum_type, x_axis_label_base)
-            
-            # EDFS Correction Logic (Duplicated from original, but clean)
-            x_lower = x_axis_label_base.lower()
-            is_mag_field = 'gauss' in x_lower or 'field' in x_lower or 'G' in x_axis_label_base or spectrum_type == 'EDFS'
-            if is_mag_field and x_vector:
-                 max_val = max(x_vector)
-                 if '(T)' in x_axis_label_base or '(Tesla)' in x_axis_label_base:
-                     x_vector = [v * 10000 for v in x_vector]
-                     x_axis_label_base = "Magnetic Field (G)"
-                 elif '(mT)' in x_axis_label_base:
-                     x_vector = [v * 10 for v in x_vector]
-                     x_axis_label_base = "Magnetic Field (G)"
-                 elif '(kG)' in x_axis_label_base or '(kg)' in x_lower:
-                     x_vector = [v * 1000 for v in x_vector]
-                     x_axis_label_base = "Magnetic Field (G)"
-                 elif spectrum_type == 'EDFS' and max_val <= 20: 
-                     x_vector = [v * 1000 for v in x_vector]
-                     x_axis_label_base = "Magnetic Field (G)"
-                     logger.info(f"Applied EDFS Correction for {base_name}")
+            except Exception as e:
+                logger.error(f"Quad-Interleave parse failed: {e}. Falling back to standard loop.")
+                parsed_quad = False
 
+        if not parsed_quad:
+            if dataset_configs is None:
+                # Quad parse failed: fall back to the layout the DSC declares
+                dataset_configs = _dataset_configs(meta, total_points_per_input, len(dta_bytes), dsc_path)
+                if dataset_configs is None:
+                    return []
             
-            # Match CSV layout: [R1, I1, R2, I2] (Stride 4)
-            # R1 (Index 0) = Real Signal (Matches CSV Col 2)
-            # R2 (Index 2) = Imag Signal (Matches CSV Col 4)
-            total_points_per_input = xpts * ypts
-            expected_total_doubles = total_points_per_input * 4
-            
-            # Helper to check complexity roughly (though we should check IKKF per dataset)
-            # Typically for CW like this, IKKF is CPLX,CPLX
-            is_complex_global = 'CPLX' in get_str(meta, 'IKKF', 'REAL')
-            
-            # Check size match for Quad-Interleave
-            is_quad_interleaved = (len(dta_bytes) // 8 == expected_total_doubles)
-            
-            parsed_quad = False
-            
-            if is_quad_interleaved and is_complex_global:
-                logger.info(f"Detected Quad-Interleaved Data (4 vals/point). Parsing as single merged spectrum.")
-                try:
-                    # We assume Big Endian Double as verified by CSV match
-                    # Parse ALL values as one flat array
-                    all_vals = struct.unpack(f">{total_points_per_input*4}d", dta_bytes)
-                    all_vals = np.array(all_vals)
-                    
-                    real_data = all_vals[0::4] # Index 0
-                    imag_data = all_vals[2::4] # Index 2
-                    
-                    filename_only = base_name.split('/')[-1]
-                    y_axis_label = f"{get_str(meta, 'YNAM')} ({get_str(meta, 'YUNI')})"
-                    
-                    if ypts > 1:
-                        # 2D Spectrum
-                        y_vector = axis_vector(meta, 'Y', ypts)
-                        z_data = []
-                        # Reshape flat real_data into rows (Standard raster order)
-                        for k in range(ypts):
-                            start = k * xpts
-                            end = start + xpts
-                            z_data.append(real_data[start:end].tolist())
-                        
-                        spec = Spectrum2D(
-                            filename=filename_only,
-                            type=spectrum_type,
-                            x_label=x_axis_label_base,
-                            y_label=y_axis_label,
-                            x_data=x_vector,
-                            y_data=y_vector,
-                            z_data=z_data,
-                            parsed_params=parsed_params
-                        )
-                    else:
-                        spec = Spectrum1D(
-                            filename=filename_only,
-                            type=spectrum_type,
-                            x_label=x_axis_label_base,
-                            y_label=y_axis_label,
-                            x_data=x_vector,
-                            real_data=real_data.tolist(),
-                            imag_data=imag_data.tolist(),
-                            parsed_params=parsed_params
-                        )
-                    spectra.append(spec)
-                    parsed_quad = True
-                    
-                except Exception as e:
-                    logger.error(f"Quad-Interleave parse failed: {e}. Falling back to standard loop.")
-                    parsed_quad = False
-
-            if not parsed_quad:
-                # --- Standard Loop (Legacy) ---
-                for idx, config in enumerate(dataset_configs):
-                    # Slice Buffer
-                    chunk = dta_bytes[current_offset : current_offset + config['size_bytes']]
-                    current_offset += config['size_bytes']
+            # --- Standard Loop (Legacy) ---
+            # Channel spectra and their real-channel quality scores, kept in lockstep
+            local_specs = []
+            local_qualities = []
+            for idx, config in enumerate(dataset_configs):
+                # Slice Buffer
+                chunk = dta_bytes[current_offset : current_offset + config['size_bytes']]
+                current_offset += config['size_bytes']
+                
+                # Numpy frombuffer implies Native byte order usually, so we must enforce explicit endian
+                dt = np.dtype(config['dtype'])
+                original_endian = config['endian']
+                dt = dt.newbyteorder(original_endian)
+                
+                data_array = np.frombuffer(chunk, dtype=dt)
+                
+                # 1. Endianness Heuristic (Magnitude)
+                # BSEQ is trusted unless a cheap probe of the head and tail disagrees
+                if len(data_array) > 0:
+                    probe = np.concatenate((data_array[:_ENDIAN_PROBE], data_array[-_ENDIAN_PROBE:]))
+                    max_val = np.max(np.abs(probe))
+                    # If values are insanely huge, swap endian
+                    if not np.isfinite(max_val) or max_val > 1e20:
+                         logger.warning(f"Detected suspicious values (max={max_val:.2e}). Swapping endian.")
+                         other_endian = '<' if original_endian == '>' else '>'
+                         dt_swapped = np.dtype(config['dtype']).newbyteorder(other_endian)
+                         data_array = np.frombuffer(chunk, dtype=dt_swapped)
+
+                # 2. Structure: Interleaved vs Block (Smoothness Heuristic)
+                # real_data/imag_data are always ndarray views of data_array (or zeros), never lists,
+                # so the [:1000] heads handed to _smooth are zero-copy slices
+                if config['is_complex'] and len(data_array) >= (xpts * 2):
+                    # Interleaved (R, I, R, I...)
+                    r_int = data_array[0::2]
+                    i_int = data_array[1::2]
                     
-                    # Numpy frombuffer implies Native byte order usually, so we must enforce explicit endian
-                    dt = np.dtype(config['dtype'])
-                    original_endian = config['endian']
-                    dt = dt.newbyteorder(original_endian)
+                    # Block (R... I...)
+                    mid = len(data_array) // 2
+                    r_blk = data_array[:mid]
+                    i_blk = data_array[mid:]
                     
-                    data_array = np.frombuffer(chunk, dtype=dt)
+                    # Score both layouts (and their imag channels for cleaning below) in one pass
+                    score_int, score_blk, s_i_int, s_i_blk = _smooth_scores(
+                        r_int[:1000], r_blk[:1000], i_int[:1000], i_blk[:1000])
                     
-                    # 1. Endianness Heuristic (Magnitude)
-                    if len(data_array) > 0:
-                        max_val = np.max(np.abs(data_array))
-                        # If values are insanely huge, swap endian
-                        if not np.isfinite(max_val) or max_val > 1e20:
-                             logger.warning(f"Detected suspicious values (max={max_val:.2e}). Swapping endian.")
-                             other_endian = '<' if original_endian == '>' else '>'
-                             dt_swapped = np.dtype(config['dtype']).newbyteorder(other_endian)
-                             data_array = np.frombuffer(chunk, dtype=dt_swapped)
-
-                    # 2. Structure: Interleaved vs Block (Smoothness Heuristic)
-                    real_data = []
-                    imag_data = []
+                    logger.info(f"Ch{idx}: Smoothness Int={score_int:.4f}, Blk={score_blk:.4f}")
                     
-                    if config['is_complex'] and len(data_array) >= (xpts * 2):
-                        # Interleaved (R, I, R, I...)
-                        r_int = data_array[0::2]
-                        i_int = data_array[1::2]
-                        
-                        # Block (R... I...)
-                        mid = len(data_array) // 2
-                        r_blk = data_array[:mid]
-                        i_blk = data_array[mid:]
-                        
-                        # Simple smoothness check
-                        def _smooth(arr):
-                             if len(arr) < 2: return 0
-                             return np.mean(np.abs(np.diff(arr))) / (np.ptp(arr) or 1.0)
-                        
-                        score_int = _smooth(r_int[:1000]) if len(r_int) > 0 else 1
-                        score_blk = _smooth(r_blk[:1000]) if len(r_blk) > 0 else 1
-                        
-                        logger.info(f"Ch{idx}: Smoothness Int={score_int:.4f}, Blk={score_blk:.4f}")
-                        
-                        if score_blk < score_int:
-                            real_data, imag_data = r_blk, i_blk
-                        else:
-                            real_data, imag_data = r_int, i_int
+                    if score_blk < score_int:
+                        real_data, imag_data = r_blk, i_blk
+                        s_r, s_i = score_blk, s_i_blk
                     else:
-                        real_data = data_array 
-                        imag_data = np.zeros_like(real_data)
-                    
-                    # Truncate to expected size
-                    if len(real_data) > total_points_per_input:
-                        real_data = real_data[:total_points_per_input]
-                        imag_data = imag_data[:total_points_per_input]
-                        
-                    # 3. Smart Cleaning (Legacy)
-                    # If Real Clean & Imag Noisy -> Zero Imag
-                    # If Real Noisy -> Mark for drop
+                        real_data, imag_data = r_int, i_int
+                        s_r, s_i = score_int, s_i_int
+                else:
+                    real_data = data_array 
+                    imag_data = np.zeros_like(real_data)
                     s_r = _smooth(real_data[:1000]) if len(real_data)>0 else 1
-                    s_i = _smooth(imag_data[:1000]) if len(imag_data)>0 else 1
-                    
-                    if s_r < 0.05 and s_i > 0.15:
-                        imag_data = np.zeros_like(real_data)
+                    s_i = 0 if len(imag_data)>0 else 1 # all zeros
+                
+                # Truncate to expected size
+                if len(real_data) > total_points_per_input:
+                    real_data = real_data[:total_points_per_input]
+                    imag_data = imag_data[:total_points_per_input]
                     
-                    suffix = f"_ch{idx+1}" if len(dataset_configs) > 1 else ""
-                    filename_only = base_name.split('/')[-1] + suffix
-                    y_axis_label = f"{get_str(meta, 'YNAM')} ({get_str(meta, 'YUNI')})"
-
-                    if ypts > 1:
-                        # 2D Spectrum (Standard Loop)
-                        y_vector = axis_vector(meta, 'Y', ypts)
-                        z_data = []
-                        # Reshape flat real_data into rows
-                        for k in range(ypts):
-                            start = k * xpts
-                            end = start + xpts
-                            z_data.append(real_data[start:end].tolist())
-                            
-                        # Standard loop: create Spectrum2D
-                        spec = Spectrum2D(
-                            filename=filename_only,
-                            type=spectrum_type,
-                            x_label=x_axis_label_base,
-                            y_label=y_axis_label,
-                            x_data=x_vector,
-                            y_data=y_vector,
-                            z_data=z_data,
-                            parsed_params=parsed_params
-                        )
-                    else:
-                        spec = Spectrum1D(
-                            filename=filename_only,
-                            type=spectrum_type,
-                            x_label=x_axis_label_base,
-                            y_label=y_axis_label, # "Intensity (a.u.)"
-                            x_data=x_vector,
-                            real_data=real_data.tolist(),
-                            imag_data=imag_data.tolist(),
-                            parsed_params=parsed_params
-                        )
-                    spec._quality_score_real = s_r
-                    spectra.append(spec)
+                # 3. Smart Cleaning (Legacy)
+                # If Real Clean & Imag Noisy -> Zero Imag
+                # If Real Noisy -> Mark for drop
+                if s_r < 0.05 and s_i > 0.15:
+                    imag_data = np.zeros_like(real_data)
                 
-                # Filter noisy spectra if we have multiple
-                if len(spectra) > 1:
-                     clean_spectra = [s for s in spectra if getattr(s, '_quality_score_real', 1.0) < 0.15]
-                     if clean_spectra and len(clean_spectra) < len(spectra):
-                         logger.info(f"Smart Filtering: Dropped {len(spectra) - len(clean_spectra)} noisy channels.")
-                         spectra = clean_spectra
-
-        except Exception as e:
-            logger.error(f"Failed to parse {dsc_path}: {e}")
+                suffix = f"_ch{idx+1}" if len(dataset_configs) > 1 else ""
+                filename_only = base_name.split('/')[-1] + suffix
+                y_axis_label = f"{get_str(meta, 'YNAM')} ({get_str(meta, 'YUNI')})"
+
+                if ypts > 1:
+                    # 2D Spectrum (Standard Loop)
+                    y_vector = axis_vector(meta, 'Y', ypts)
+                    # Reshape flat real_data into rows
+                    z_data = np.ascontiguousarray(real_data).reshape(ypts, xpts)
+                        
+                    # Standard loop: create Spectrum2D
+                    spec = Spectrum2D(
+                        filename=filename_only,
+                        type=spectrum_type,
+                        x_label=x_axis_label_base,
+                        y_label=y_axis_label,
+                        x_data=x_vector,
+                        y_data=y_vector,
+                        z_data=z_data,
+                        parsed_params=parsed_params
+                    )
+                else:
+                    spec = Spectrum1D(
+                        filename=filename_only,
+                        type=spectrum_type,
+                        x_label=x_axis_label_base,
+                        y_label=y_axis_label, # "Intensity (a.u.)"
+                        x_data=x_vector,
+                        real_data=real_data,
+                        imag_data=imag_data,
+                        parsed_params=parsed_params
+                    )
+                local_specs.append(spec)
+                local_qualities.append(s_r)
+            
+            # Filter noisy spectra if we have multiple
+            if len(local_specs) > 1:
+                 clean_spectra = [s for s, q in zip(local_specs, local_qualities) if q < 0.15]
+                 if clean_spectra and len(clean_spectra) < len(local_specs):
+                     logger.info(f"Smart Filtering: Dropped {len(local_specs) - len(clean_spectra)} noisy channels.")
+                     local_specs = clean_spectra
+            spectra.extend(local_specs)
+
+        if pooled:
+            _detach_spectra(spectra, dta_bytes)
+
+    except Exception as e:
+        logger.error(f"Failed to parse {dsc_path}: {e}")
+        return []
+
+    return spectra
+
+def _prefetch_dta(zf: zipfile.ZipFile, mm: mmap.mmap):
+    # Ask the kernel to start reading every DTA member in while the DSCs are being parsed
+    if not hasattr(mm, 'madvise') or not hasattr(mmap, 'MADV_WILLNEED'):
+        return
+    for info in zf.infolist():
+        if not info.filename.lower().endswith('.dta'):
             continue
+        start = info.header_offset - info.header_offset % mmap.PAGESIZE
+        end = min(info.header_offset + _LOCAL_HEADER_SIZE + len(info.orig_filename) + len(info.extra)
+                  + info.compress_size, len(mm))
+        if end > start:
+            mm.madvise(mmap.MADV_WILLNEED, start, end - start)
+
+def _parse_archive(source: Union[bytes, str], content) -> Tuple[str, List[Union[Spectrum1D, Spectrum2D]], int]:
+    # source: what ZipFile reads from (upload bytes or a path); content: the raw archive buffer
+    zf = _open_zip(source)
+    spectra = []
+    sample_name = "Uploaded Sample"
+    
+    # 1. Look for metadata.json files (Simulated/Processed export format)
+    # For now, sticking to BES3T logic as that's the core request, 
+    # but the frontend also handled metadata.json. Let's prioritize .DSC for now
+    # as the user requested "move all processing to backend" implying the raw data parsing.
+    
+    # namelist() builds a fresh list per call; look it up once
+    names = zf.namelist()
+    names_set = set(names)
+    names_lower_map = {n.lower(): n for n in names}
+    
+    dsc_files = [f for f in names if f.lower().endswith('.dsc')]
+    
+    if isinstance(content, mmap.mmap):
+        _prefetch_dta(zf, content)
+    
+    # DSC/DTA pairs are independent; parse them concurrently, keeping archive order
+    if dsc_files:
+        workers = min(len(dsc_files), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers, initializer=_open_worker_zip, initargs=(source, content)) as pool:
+            results = pool.map(
+                lambda dsc_path: _parse_dsc_pair(dsc_path, names, names_set, names_lower_map),
+                dsc_files,
+            )
+            for pair_spectra in results:
+                spectra.extend(pair_spectra)
             
     # Heuristic for sample name
     if spectra:
         sample_name = spectra[0].parsed_params.get('sampleName', sample_name)
         
     return sample_name, spectra, len(spectra)
+
+def parse_zip_archive(content: bytes) -> Tuple[str, List[Union[Spectrum1D, Spectrum2D]], int]:
+    return _parse_archive(content, content)
+
+def parse_zip_archive_path(path: str) -> Tuple[str, List[Union[Spectrum1D, Spectrum2D]], int]:
+    # Archive on disk: never load it whole. ZipFile reads through the file, and stored DTA
+    # members are viewed straight out of a read-only mmap (kept alive by the arrays using it).
+    zipfile.ZipFile(path).close() # fail early (BadZipFile) before mapping
+    with open(path, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return _parse_archive(path, mm)
@@ -0,0 +1,213 @@
+import unittest
+import sys
+import os
+import io
+import tempfile
+import zipfile
+
+import numpy as np
+
+# Add parent directory to path so we can import parsers
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import parsers
+
+class ParserTests(unittest.TestCase):
+    def make_zip(self, files, compression=zipfile.ZIP_STORED):
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, "w", compression) as zf:
+            for name, data in files.items():
+                zf.writestr(name, data)
+        return buf.getvalue()
+
+    def test_quad_interleaved_1d(self):
+        xpts = 16
+        # [R1, I1, R2, I2] per point, Big Endian Double
+        quad = np.arange(xpts * 4, dtype='>f8').reshape(xpts, 4)
+        content = self.make_zip({
+            "S1_10K_CW.DSC": "IKKF CPLX,CPLX\nIRFMT D,D\nXPTS 16\nXMIN 3000\nXWID 150\nXNAM Field\nXUNI G\n",
+            "S1_10K_CW.DTA": quad.tobytes(),
+        })
+
+        sample_name, spectra, count = parsers.parse_zip_archive(content)
+
+        self.assertEqual(sample_name, "S1")
+        self.assertEqual(count, 1)
+        spec = spectra[0]
+        self.assertIsInstance(spec, parsers.Spectrum1D)
+        self.assertEqual(spec.type, "CW")
+        np.testing.assert_array_equal(spec.real_data, quad[:, 0])
+        np.testing.assert_array_equal(spec.imag_data, quad[:, 2])
+        np.testing.assert_allclose(spec.x_data, np.linspace(3000, 3150, xpts))
+
+    def test_quad_interleaved_2d(self):
+        xpts, ypts = 8, 3
+        quad = np.arange(xpts * ypts * 4, dtype='>f8').reshape(xpts * ypts, 4)
+        content = self.make_zip({
+            "S1_HYSCORE.DSC": "IKKF CPLX,CPLX\nIRFMT D,D\nXPTS 8\nYPTS 3\nXMIN 0\nXWID 7\nYMIN 0\nYWID 2\n",
+            "S1_HYSCORE.DTA": quad.tobytes(),
+        })
+
+        _, spectra, _ = parsers.parse_zip_archive(content)
+
+        spec = spectra[0]
+        self.assertIsInstance(spec, parsers.Spectrum2D)
+        self.assertEqual(spec.type, "HYSCORE")
+        np.testing.assert_array_equal(spec.z_data, quad[:, 0].reshape(ypts, xpts))
+        np.testing.assert_allclose(spec.y_data, [0, 1, 2])
+
+    def test_quad_detected_before_dataset_size_check(self):
+        # One declared dataset, but the DTA holds four doubles per point
+        quad = np.arange(16 * 4, dtype='>f8').reshape(16, 4)
+        content = self.make_zip({
+            "S1_CW.DSC": "IKKF CPLX\nIRFMT D\nXPTS 16\nXMIN 0\nXWID 15\n",
+            "S1_CW.DTA": quad.tobytes(),
+        })
+
+        with self.assertNoLogs(parsers.logger, level="WARNING"):
+            _, spectra, count = parsers.parse_zip_archive(content)
+
+        self.assertEqual(count, 1)
+        np.testing.assert_array_equal(spectra[0].real_data, quad[:, 0])
+        np.testing.assert_array_equal(spectra[0].imag_data, quad[:, 2])
+
+    def test_archive_keeps_every_pair_in_order(self):
+        xpts = 32
+        real = np.linspace(0, 1, xpts, dtype='>f8')
+        quad = np.arange(xpts * 4, dtype='>f8').reshape(xpts, 4)
+        content = self.make_zip({
+            "S1_T1.DSC": "IKKF REAL\nIRFMT D\nXPTS 32\nXMIN 0\nXWID 31\n",
+            "S1_T1.DTA": real.tobytes(),
+            "S1_CW.DSC": "IKKF CPLX,CPLX\nIRFMT D,D\nXPTS 32\nXMIN 0\nXWID 31\n",
+            "S1_CW.DTA": quad.tobytes(),
+        })
+
+        _, spectra, count = parsers.parse_zip_archive(content)
+
+        self.assertEqual(count, 2)
+        self.assertEqual([s.filename for s in spectra], ["S1_T1", "S1_CW"])
+        np.testing.assert_array_equal(spectra[0].real_data, real)
+        np.testing.assert_array_equal(spectra[0].imag_data, np.zeros(xpts))
+
+    def test_stored_and_deflated_members_match(self):
+        files = {
+            "S1_CW.DSC": "IKKF CPLX\nIRFMT D\nXPTS 64\nXMIN 0\nXWID 63\n",
+            "S1_CW.DTA": np.sin(np.linspace(0, 3, 128)).astype('>f8').tobytes(),
+        }
+        _, stored, _ = parsers.parse_zip_archive(self.make_zip(files))
+        _, deflated, _ = parsers.parse_zip_archive(self.make_zip(files, zipfile.ZIP_DEFLATED))
+
+        np.testing.assert_array_equal(stored[0].real_data, deflated[0].real_data)
+        np.testing.assert_array_equal(stored[0].imag_data, deflated[0].imag_data)
+
+    def test_deflated_pairs_do_not_share_read_buffer(self):
+        # Each worker reuses one read buffer, kept channels must survive the next pair
+        files = {}
+        for i in range(4):
+            files[f"S1_CW{i}.DSC"] = "IKKF CPLX\nIRFMT D\nXPTS 64\nXMIN 0\nXWID 63\n"
+            files[f"S1_CW{i}.DTA"] = (np.sin(np.linspace(0, 3, 128)) * (i + 1)).astype('>f8').tobytes()
+
+        _, stored, _ = parsers.parse_zip_archive(self.make_zip(files))
+        _, deflated, count = parsers.parse_zip_archive(self.make_zip(files, zipfile.ZIP_DEFLATED))
+
+        self.assertEqual(count, 4)
+        for a, b in zip(stored, deflated):
+            np.testing.assert_array_equal(a.real_data, b.real_data)
+            np.testing.assert_array_equal(a.imag_data, b.imag_data)
+
+    def test_parse_zip_archive_path(self):
+        quad = np.arange(16 * 4, dtype='>f8').reshape(16, 4)
+        content = self.make_zip({
+            "S1_CW.DSC": "IKKF CPLX,CPLX\nIRFMT D,D\nXPTS 16\nXMIN 0\nXWID 15\n",
+            "S1_CW.DTA": quad.tobytes(),
+        })
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "archive.zip")
+            with open(path, "wb") as f:
+                f.write(content)
+
+            sample_name, spectra, count = parsers.parse_zip_archive_path(path)
+
+            self.assertEqual((sample_name, count), ("S1", 1))
+            np.testing.assert_array_equal(spectra[0].real_data, quad[:, 0])
+
+    def test_wrong_endian_is_swapped(self):
+        xpts = 200
+        data = np.empty(xpts * 2)
+        data[0::2] = np.exp(-np.linspace(0, 3, xpts)) * 1e3
+        data[1::2] = np.exp(-np.linspace(0, 2, xpts))
+        content = self.make_zip({
+            # BSEQ claims Big Endian but the data was written Little Endian
+            "S1_T1.DSC": "BSEQ BIG\nIKKF CPLX\nIRFMT D\nXPTS 200\nXMIN 0\nXWID 199\n",
+            "S1_T1.DTA": data.astype('<f8').tobytes(),
+        })
+
+        _, spectra, _ = parsers.parse_zip_archive(content)
+
+        np.testing.assert_array_equal(spectra[0].real_data, data[0::2])
+
+    def test_parse_dsc_text(self):
+        meta = parsers.parse_dsc_text(
+            "#DESC\t1.2 * DESCRIPTOR INFORMATION\n"
+            "*\tcomment line\n"
+            "   * indented comment\n"
+            "\n"
+            "XPTS\t1024\n"
+            "xnam   'Field'  \r\n"
+            "d1 = 400\n"
+            "EMPTY\n"
+        )
+        self.assertEqual(meta, {'#DESC': '1.2 * DESCRIPTOR INFORMATION', 'XPTS': '1024',
+                                'XNAM': "'Field'", 'D1': '400'})
+
+    def test_parse_params_from_name(self):
+        params = parsers.parse_params_from_name("Ag3_20K_Rabi_p16_HPA11dB_3385G_SW2p5.DSC")
+        self.assertEqual(params['sampleName'], "Ag3")
+        self.assertEqual(params['temperatureK'], 20.0)
+        self.assertEqual(params['fieldG'], 3385.0)
+        self.assertEqual(params['amplifierDb'], 11.0)
+        self.assertEqual(params['pulseWidth'], 16.0)
+        self.assertEqual(params['spectralWidth'], 2.5)
+        self.assertEqual(params['tokens'], ("Ag3", "20K", "Rabi", "p16", "HPA11dB", "3385G", "SW2p5"))
+        # Cached result is shared, so it must be read-only
+        self.assertIs(parsers.parse_params_from_name("Ag3_20K_Rabi_p16_HPA11dB_3385G_SW2p5.DSC"), params)
+        with self.assertRaises(TypeError):
+            params['sampleName'] = "other"
+
+    def test_smooth(self):
+        ramp = np.arange(11, dtype='>f8')
+        self.assertAlmostEqual(parsers._smooth(ramp), 0.1)
+        self.assertEqual(parsers._smooth(np.ones(5)), 0)
+        # int32 channels must not overflow in the difference/range
+        big = np.array([-2**31 + 1, 2**31 - 1] * 4, dtype=np.int32)
+        self.assertAlmostEqual(parsers._smooth(big), 1.0)
+
+    def test_infer_spectrum_type(self):
+        self.assertEqual(parsers.infer_spectrum_type("Ag3_20K_EDFS_SW2000", {}, False), "EDFS")
+        # Marker priority, not position: T1 beats an earlier "2D"
+        self.assertEqual(parsers.infer_spectrum_type("S_2D_T1", {}, True), "2D T1")
+        self.assertEqual(parsers.infer_spectrum_type("S_2D", {}, False), "CW")
+        self.assertEqual(parsers.infer_spectrum_type("S_scan", {'EXPT': 'PULSED'}, False), "T1")
+        self.assertEqual(parsers.infer_spectrum_type("S_scan", {}, False), "Unknown")
+
+    def test_normalize_x_for_time_type(self):
+        x = np.array([100.0, 200.0, 300.0])
+        np.testing.assert_array_equal(parsers.normalize_x_for_time_type(x, 'T1', 'Time (ns)'), [0, 100, 200])
+        # EDFS is a field sweep even when Bruker labels it in time units
+        np.testing.assert_array_equal(parsers.normalize_x_for_time_type(x, 'EDFS', 'Time (us)'), x)
+
+    def test_build_x_axis(self):
+        # Time type on a kG axis: zeroed first, then converted to Gauss
+        x, label = parsers.build_x_axis({'XMIN': '3', 'XWID': '2'}, 3, 'T1', 'Field (kG)')
+        np.testing.assert_allclose(x, [0, 1000, 2000])
+        self.assertEqual(label, "Magnetic Field (G)")
+        # EDFS reported in small numbers is assumed to be kG
+        x, label = parsers.build_x_axis({'XSTRT': '0.3', 'XSTOP': '0.4'}, 2, 'EDFS', 'Field (us)')
+        np.testing.assert_allclose(x, [300, 400])
+        self.assertEqual(label, "Magnetic Field (G)")
+        x, label = parsers.build_x_axis({'XMIN': '100', 'XWID': '10'}, 2, 'CW', 'Frequency (MHz)')
+        np.testing.assert_allclose(x, [100, 110])
+        self.assertEqual(label, "Frequency (MHz)")
+
+if __name__ == "__main__":
+    unittest.main()